@@ -106,17 +106,14 @@ def access_secret_version(project_id, secret_id, version_id="latest"):
         logging.error(f"Failed to access secret '{secret_id}/{version_id}' in project '{project_id}': {e}", exc_info=False) # Less verbose on retry
         raise
 
-def check_gcs_blob_exists(bucket, blob_name):
-    """Checks if a specific blob exists in the GCS bucket."""
+@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10), reraise=True)
+def list_existing_gcs_blobs(bucket, prefix):
+    """Lists blob names under a GCS prefix in one paged call, for local existence checks, with retries."""
     try:
-        blob = bucket.blob(blob_name)
-        exists = blob.exists()
-        return exists
+        return {blob.name for blob in bucket.list_blobs(prefix=prefix, fields='items(name),nextPageToken')}
     except Exception as e:
-        logging.error(f"Error checking GCS existence for gs://{bucket.name}/{blob_name}: {e}", exc_info=True)
-        # Default to assuming it doesn't exist on error to allow download attempt maybe?
-        # Or re-raise/return specific error? Let's assume download attempt is okay.
-        return False
+        logging.error(f"Error listing GCS blobs under gs://{bucket.name}/{prefix}: {e}", exc_info=False) # Less verbose on retry
+        raise # Reraise for tenacity; an empty set would re-download every filing
 
 RETRYABLE_REQUEST_EXCEPTIONS = (
     requests.exceptions.Timeout,
@@ -261,6 +258,9 @@ def main():
         total_rows_in_batch = results.total_rows # Note: Might be None if LIMIT wasn't used accurately by BQ backend sometimes
         logging.info(f"Query returned {total_rows_in_batch if total_rows_in_batch is not None else 'unknown number of'} filings to check.")
 
+        existing_pdfs = list_existing_gcs_blobs(bucket, GCS_PDF_FOLDER)
+        logging.info(f"Found {len(existing_pdfs)} existing blobs under gs://{GCS_BUCKET_NAME}/{GCS_PDF_FOLDER}")
+
         # --- Process Loop ---
         row_iterator = iter(results) # Get iterator
         while True:
@@ -306,7 +306,7 @@ def main():
                  gcs_full_uri = f"gs://{GCS_BUCKET_NAME}/{gcs_relative_path}"
 
                  logging.info(f"[{log_prefix}] Checking existence: {gcs_full_uri}")
-                 pdf_exists = check_gcs_blob_exists(bucket, gcs_relative_path)
+                 pdf_exists = gcs_relative_path in existing_pdfs
 
                  if pdf_exists:
                      logging.info(f"[{log_prefix}] PDF already exists. Skipping download.")
@@ -327,6 +327,7 @@ def main():
 
                          logging.info(f"[{log_prefix}] Successfully processed.")
                          processed_count += 1
+                         existing_pdfs.add(gcs_relative_path)
 
                      except Exception as download_upload_err:
                           # Errors during download/upload already logged in helper functions
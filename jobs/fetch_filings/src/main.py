@@ -51,6 +51,9 @@ SEC_API_SECRET_VERSION = os.getenv('SEC_API_SECRET_VERSION', 'latest')
 LOOKBACK_HOURS = int(os.getenv('LOOKBACK_HOURS', '24'))
 FILING_TYPES = os.getenv('FILING_TYPES', '"10-K","10-Q"')
 TICKERS_TO_QUERY = os.getenv('TICKERS_TO_QUERY')
+TICKER_CHUNK_SIZE = int(os.getenv('TICKER_CHUNK_SIZE', '250'))
+SEC_QUERY_PAGE_SIZE = 200
+SEC_QUERY_MAX_RESULTS = 10000  # Query API does not page beyond from=10000
 
 # --- SIC to Sector/Industry Mapping ---
 SIC_TO_SECTOR_INDUSTRY = {
@@ -81,6 +84,16 @@ SIC_TO_SECTOR_INDUSTRY = {
     3823: ("Industrials", "Instruments for Measurement")
 }
 
+def _build_sic_lookup():
+    """Flatten SIC_TO_SECTOR_INDUSTRY to SIC -> (sector, industry); earlier entries win, as in a linear scan."""
+    lookup = {}
+    for sic_key, sector_industry in SIC_TO_SECTOR_INDUSTRY.items():
+        for sic in (sic_key if isinstance(sic_key, range) else (sic_key,)):
+            lookup.setdefault(sic, sector_industry)
+    return lookup
+
+SIC_LOOKUP = _build_sic_lookup()
+
 def parse_sic_code(sic_str):
     """Extract or pad numeric SIC code from string (e.g., '100' -> '0100')."""
     if not sic_str:
@@ -104,11 +117,8 @@ def get_sector_industry(sic_code):
         logging.debug(f"Invalid SIC code '{sic_code}'; returning None for sector and industry")
         return None, None
     sic = int(sic_code)
-    for sic_range, (sector, industry) in SIC_TO_SECTOR_INDUSTRY.items():
-        if isinstance(sic_range, range) and sic in sic_range:
-            return sector, industry
-        elif isinstance(sic_range, int) and sic == sic_range:
-            return sector, industry
+    if sic in SIC_LOOKUP:
+        return SIC_LOOKUP[sic]
     logging.warning(f"SIC code {sic} not found in mapping; returning None for sector and industry")
     return None, None
 
@@ -297,12 +307,26 @@ def access_secret_version(project_id, secret_id, version_id="latest"):
         raise
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=30), reraise=True)
+def fetch_filings_page(api_client, query_string, offset, rate_limiter=None):
+    """Fetches one page of SEC API results for a query string. Returns (filings, total)."""
+    if rate_limiter:
+        rate_limiter.acquire()
+
+    query = {
+        "query": {"query_string": {"query": query_string}},
+        "from": str(offset),
+        "size": str(SEC_QUERY_PAGE_SIZE),
+        "sort": [{"filedAt": {"order": "desc"}}]
+    }
+    response = api_client.get_filings(query)
+    filings = response.get('filings', [])
+    total = response.get('total', {}).get('value', len(filings))
+    return filings, total
+
 def get_recent_sec_filings(api_client, lookback_hours, filing_types_str, tickers_list=None, rate_limiter=None):
-    """Queries the SEC API for recent filings."""
+    """Queries the SEC API for recent filings, paging through all results of the query."""
     if not api_client:
         raise RuntimeError("SEC QueryApi client not initialized.")
-    if rate_limiter:
-        rate_limiter.acquire()
 
     end_date = datetime.datetime.now(datetime.timezone.utc)
     start_date = end_date - datetime.timedelta(hours=lookback_hours)
@@ -315,22 +339,27 @@ def get_recent_sec_filings(api_client, lookback_hours, filing_types_str, tickers
         'NOT formType:("10-K/A" OR "10-Q/A")'
     ]
     if tickers_list:
-        ticker_query = " OR ".join([f'ticker:"{t.strip().upper()}"' for t in tickers_list])
-        query_parts.append(f'({ticker_query})')
+        ticker_query = " OR ".join([f'"{t.strip().upper()}"' for t in tickers_list])
+        query_parts.append(f'ticker:({ticker_query})')
 
     final_query_string = " AND ".join(query_parts)
     logging.info(f"SEC API Query String: {final_query_string}")
 
-    query = {
-        "query": {"query_string": {"query": final_query_string}},
-        "from": "0",
-        "size": "200",
-        "sort": [{"filedAt": {"order": "desc"}}]
-    }
-
+    filings = []
+    total = 0
     try:
-        response = api_client.get_filings(query)
-        filings = response.get('filings', [])
+        while len(filings) < SEC_QUERY_MAX_RESULTS:
+            page, total = fetch_filings_page(api_client, final_query_string, len(filings), rate_limiter)
+            filings.extend(page)
+            if not page or len(filings) >= total:
+                break
+        if total > len(filings):
+            logging.warning(f"SEC API reported {total} matching filings but only {len(filings)} were fetched (page limit {SEC_QUERY_MAX_RESULTS} or an empty page); the rest are skipped this run.")
+        # Results can shift between pages while new filings arrive; keep the first copy of each accession
+        unique_filings = {}
+        for filing in filings:
+            unique_filings.setdefault(filing.get('accessionNo') or id(filing), filing)
+        filings = list(unique_filings.values())
         logging.info(f"SEC API returned {len(filings)} filings for the last {lookback_hours} hours.")
         return filings
     except Exception as e:
@@ -476,8 +505,8 @@ def main():
         rate_limiter = RateLimiter(rate_limit=8, period=1.0)  # 8 requests/second
         recent_filings = []
         if tickers:
-            chunk_size = 50  # Process tickers in chunks to manage query size
-            ticker_chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+            # One query per chunk of tickers; results are paged, so chunks only need to bound query length
+            ticker_chunks = [tickers[i:i + TICKER_CHUNK_SIZE] for i in range(0, len(tickers), TICKER_CHUNK_SIZE)]
             with ThreadPoolExecutor(max_workers=3) as executor:
                 futures = [
                     executor.submit(get_recent_sec_filings, query_api, LOOKBACK_HOURS, FILING_TYPES, chunk, rate_limiter)
@@ -12,6 +12,7 @@ import re
 import json
 import sys
 import io
+from concurrent.futures import ThreadPoolExecutor
 
 # --- Configuration ---
 GCP_PROJECT_ID = os.getenv('GCP_PROJECT_ID', 'profit-scout-456416')
@@ -226,15 +227,13 @@ def process_financial_df(data, ticker, statement_type, accession_number, filed_d
             logging.warning(f"Empty {statement_type} DataFrame after flattening")
             return pd.DataFrame([metadata])
         df_financial.columns = [create_snake_case_name(col) or f"col_{i}" for i, col in enumerate(df_financial.columns)]
-        df_financial = df_financial.dropna(axis=1, how='all')
+        df_financial = df_financial.loc[:, df_financial.notna().to_numpy().any(axis=0)]
         df_consolidated = consolidate_data(df_financial, period_of_report)
         if df_consolidated.empty:
             logging.warning(f"No consolidated {statement_type} data after consolidation")
             return pd.DataFrame([metadata])
-        for col in df_consolidated.columns:
-            df_consolidated[col] = pd.to_numeric(df_consolidated[col], errors='coerce')
-        for col, value in metadata.items():
-            df_consolidated[col] = pd.Series([value] * len(df_consolidated)).reindex(df_consolidated.index)
+        df_consolidated = df_consolidated.apply(pd.to_numeric, errors='coerce')
+        df_consolidated = df_consolidated.assign(**metadata)
         for col in ['period_end_date', 'filing_date']:
             if col in df_consolidated and not pd.isna(df_consolidated[col].iloc[0]):
                 df_consolidated[col] = df_consolidated[col].dt.tz_convert('UTC')
@@ -346,43 +345,58 @@ def main():
         """
         if MAX_FILINGS_TO_PROCESS > 0:
             query += f" LIMIT {MAX_FILINGS_TO_PROCESS}"
-        query_job = bq_client.query(query)
-        filings = list(query_job.result())
-        total_checked = len(filings)
+        filings_df = bq_client.query(query).result().to_dataframe(create_bqstorage_client=False)
+        total_checked = len(filings_df)
         logging.info(f"Found {total_checked} filings to check")
-        accession_numbers = [row.AccessionNumber for row in filings]
+        accession_numbers = set(filings_df['AccessionNumber'].values)
         prefixes = [GCS_BS_PREFIX, GCS_IS_PREFIX, GCS_CF_PREFIX]
         existing = check_existing_filings_in_gcs(GCS_BUCKET_NAME, prefixes, accession_numbers)
-        to_process = [
-            (row.Ticker, row.AccessionNumber, row.AccessionNumber, row.LinkToFilingDetails, row.FiledDate)
-            for row in filings if row.AccessionNumber not in existing
-        ]
+        pending_df = filings_df[~filings_df['AccessionNumber'].isin(existing)]
+        to_process = list(zip(
+            pending_df['Ticker'].values,
+            pending_df['AccessionNumber'].values,
+            pending_df['AccessionNumber'].values,
+            pending_df['LinkToFilingDetails'].values,
+            pending_df['FiledDate'].values
+        ))
         logging.info(f"{len(to_process)} filings to process (skipped {total_checked - len(to_process)})")
-        for ticker, original_accession, accession_number, filing_url, filed_date in to_process:
-            log_prefix = f"{ticker}_{accession_number}"
+        valid_filings = []
+        for filing in to_process:
+            ticker, original_accession, accession_number = filing[:3]
             if not all(c.isascii() for c in ticker) or not all(c.isascii() for c in original_accession):
-                logging.error(f"Skipping {log_prefix} due to non-ASCII characters: ticker='{ticker}', accession='{original_accession}'")
+                logging.error(f"Skipping {ticker}_{accession_number} due to non-ASCII characters: ticker='{ticker}', accession='{original_accession}'")
                 failed_count += 1
                 continue
-            logging.info(f"Processing {log_prefix}")
-            try:
-                income_data, balance_data, cashflow_data, period_of_report, shares_outstanding = fetch_financial_statements_by_url(xbrl_api_client, filing_url)
-                income_df = process_financial_df(income_data, ticker, 'income_statement', accession_number, filed_date, period_of_report)
-                balance_df = process_financial_df(balance_data, ticker, 'balance_sheet', accession_number, filed_date, period_of_report, shares_outstanding)
-                cash_flow_df = process_financial_df(cashflow_data, ticker, 'cash_flow', accession_number, filed_date, period_of_report)
-                income_uri = balance_uri = cashflow_uri = None
-                if not income_df.empty:
-                    income_uri = upload_to_gcs(income_df, GCS_BUCKET_NAME, GCS_IS_PREFIX, ticker, accession_number, 'income_statement')
-                if not balance_df.empty:
-                    balance_uri = upload_to_gcs(balance_df, GCS_BUCKET_NAME, GCS_BS_PREFIX, ticker, accession_number, 'balance_sheet')
-                if not cash_flow_df.empty:
-                    cashflow_uri = upload_to_gcs(cash_flow_df, GCS_BUCKET_NAME, GCS_CF_PREFIX, ticker, accession_number, 'cash_flow')
-                update_metadata_with_uris(ticker, original_accession, income_uri, balance_uri, cashflow_uri)
-                processed_count += 1
-                logging.info(f"Successfully processed {log_prefix}")
-            except Exception as e:
-                logging.error(f"Failed processing {log_prefix}: {e}")
-                failed_count += 1
+            valid_filings.append(filing)
+        # Prefetch the next filing's XBRL while the current one is parsed and written to GCS/BigQuery
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="XbrlPrefetch") as executor:
+            next_future = None
+            if valid_filings:
+                next_future = executor.submit(fetch_financial_statements_by_url, xbrl_api_client, valid_filings[0][3])
+            for i, (ticker, original_accession, accession_number, filing_url, filed_date) in enumerate(valid_filings):
+                log_prefix = f"{ticker}_{accession_number}"
+                xbrl_future = next_future
+                if i + 1 < len(valid_filings):
+                    next_future = executor.submit(fetch_financial_statements_by_url, xbrl_api_client, valid_filings[i + 1][3])
+                logging.info(f"Processing {log_prefix}")
+                try:
+                    income_data, balance_data, cashflow_data, period_of_report, shares_outstanding = xbrl_future.result()
+                    income_df = process_financial_df(income_data, ticker, 'income_statement', accession_number, filed_date, period_of_report)
+                    balance_df = process_financial_df(balance_data, ticker, 'balance_sheet', accession_number, filed_date, period_of_report, shares_outstanding)
+                    cash_flow_df = process_financial_df(cashflow_data, ticker, 'cash_flow', accession_number, filed_date, period_of_report)
+                    income_uri = balance_uri = cashflow_uri = None
+                    if not income_df.empty:
+                        income_uri = upload_to_gcs(income_df, GCS_BUCKET_NAME, GCS_IS_PREFIX, ticker, accession_number, 'income_statement')
+                    if not balance_df.empty:
+                        balance_uri = upload_to_gcs(balance_df, GCS_BUCKET_NAME, GCS_BS_PREFIX, ticker, accession_number, 'balance_sheet')
+                    if not cash_flow_df.empty:
+                        cashflow_uri = upload_to_gcs(cash_flow_df, GCS_BUCKET_NAME, GCS_CF_PREFIX, ticker, accession_number, 'cash_flow')
+                    update_metadata_with_uris(ticker, original_accession, income_uri, balance_uri, cashflow_uri)
+                    processed_count += 1
+                    logging.info(f"Successfully processed {log_prefix}")
+                except Exception as e:
+                    logging.error(f"Failed processing {log_prefix}: {e}")
+                    failed_count += 1
         skipped_count = total_checked - (processed_count + failed_count)
     except Exception as e:
         logging.critical(f"Critical error: {e}")
@@ -4,7 +4,6 @@
 import os
 import time
 import logging
-import tempfile
 import json
 import sys
 import pkg_resources
@@ -206,28 +205,17 @@ def main():
     if MAX_ASSESSMENTS_TO_GENERATE > 0:
         to_process = to_process[:MAX_ASSESSMENTS_TO_GENERATE]
 
-    tmp_dir = tempfile.mkdtemp()
     for idx, (t, acc, filed_date) in enumerate(to_process, 1):
         base = f"{t}_{acc}"
-        local_path = os.path.join(tmp_dir, f"{base}.txt")
         try:
             txt = get_headline_risk_assessment(t, filed_date=filed_date, lookback_days=30)
-            with open(local_path, 'w', encoding='utf-8') as f:
-                f.write(txt)
             blob = bucket.blob(f"{GCS_HEADLINE_OUTPUT_FOLDER}{base}.txt")
-            blob.upload_from_filename(local_path)
+            blob.upload_from_string(txt, content_type='text/plain; charset=utf-8')
             processed += 1
             logging.info(f"[{idx}/{len(to_process)}] Uploaded {base}.txt")
         except Exception as e:
             failed += 1
             logging.error(f"Failed {base}: {e}", exc_info=True)
-        finally:
-            try: os.remove(local_path)
-            except: pass
-
-    # Cleanup
-    try: os.rmdir(tmp_dir)
-    except: pass
 
     duration = time.time() - start
     logging.info(f"Done in {duration:.1f}s — processed {processed}, failed {failed}")
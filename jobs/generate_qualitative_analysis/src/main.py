@@ -220,10 +220,10 @@ def download_pdf(bucket, blob_name, local_path):
         raise IOError("Downloaded PDF missing or appears empty.")
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=2, max=10), reraise=True)
-def upload_txt(bucket, local_path, blob_path):
-    bucket.blob(blob_path).upload_from_filename(local_path)
+def upload_txt(bucket, text, blob_path):
+    bucket.blob(blob_path).upload_from_string(text, content_type='text/plain; charset=utf-8')
 
-async def process_pdf(client, bucket, blob_name, temp_dir):
+async def process_pdf(client, bucket, blob_name, temp_dir, existing_txt):
     basename = os.path.basename(blob_name)
     ticker, _, _, accession_no = extract_info_from_filename(blob_name)
     if not ticker or not accession_no:
@@ -231,13 +231,12 @@ async def process_pdf(client, bucket, blob_name, temp_dir):
 
     key = f"{ticker}_{accession_no}"
     txt_blob_path = f"{GCS_ANALYSIS_TXT_PREFIX}{key}.txt"
-    if bucket.blob(txt_blob_path).exists():
+    if txt_blob_path in existing_txt:
         return 'skipped_existing'
 
     logging.info(f"Processing {key}")
     status = 'error_unexpected'
     local_pdf = os.path.join(temp_dir, basename)
-    local_txt = None
     temp_gcs_path = None
 
     try:
@@ -248,10 +247,7 @@ async def process_pdf(client, bucket, blob_name, temp_dir):
         analysis = await generate_analysis(client, file_obj)
         status = 'success'
 
-        local_txt = os.path.join(temp_dir, f"{key}.txt")
-        with open(local_txt, 'w', encoding='utf-8') as f:
-            f.write(analysis)
-        upload_txt(bucket, local_txt, txt_blob_path)
+        upload_txt(bucket, analysis, txt_blob_path)
         logging.info(f"[{ticker}] Saved analysis to: gs://{GCS_BUCKET_NAME}/{txt_blob_path}")
 
     except Exception as e:
@@ -269,12 +265,11 @@ async def process_pdf(client, bucket, blob_name, temp_dir):
                 delete_from_gcs(bucket, temp_gcs_path)
             except Exception:
                 pass
-        for path in [local_pdf, local_txt]:
-            if path and os.path.exists(path):
-                try:
-                    os.remove(path)
-                except OSError:
-                    pass
+        if os.path.exists(local_pdf):
+            try:
+                os.remove(local_pdf)
+            except OSError:
+                pass
 
     return status
 
@@ -299,16 +294,27 @@ async def main():
             if b.name.lower().endswith('.pdf')
         ]
         logging.info(f"Found {len(blobs)} PDFs to process")
+        existing_txt = {
+            b.name
+            for b in bucket.list_blobs(prefix=GCS_ANALYSIS_TXT_PREFIX, fields='items(name),nextPageToken')
+        }
+        logging.info(f"Found {len(existing_txt)} existing analyses")
 
         temp_dir = tempfile.mkdtemp()
-        sem = asyncio.Semaphore(MAX_WORKERS)
+        pending = asyncio.Queue()
+        for blob_name in blobs:
+            pending.put_nowait(blob_name)
 
-        async def sem_task(blob_name):
-            async with sem:
-                status = await process_pdf(client, bucket, blob_name, temp_dir)
+        async def worker():
+            while True:
+                try:
+                    blob_name = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                status = await process_pdf(client, bucket, blob_name, temp_dir, existing_txt)
                 results_summary[status] += 1
 
-        await asyncio.gather(*(sem_task(b) for b in blobs))
+        await asyncio.gather(*(worker() for _ in range(MAX_WORKERS)))
 
         try:
             os.rmdir(temp_dir)
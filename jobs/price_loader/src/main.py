@@ -14,6 +14,8 @@ GCP_PROJECT_ID       = os.getenv('GCP_PROJECT_ID')
 BQ_DATASET_ID        = os.getenv('BQ_DATASET_ID', 'profit_scout')
 BQ_PRICE_TABLE_ID    = os.getenv('BQ_PRICES_TABLE_ID', 'price_data')
 BQ_METADATA_TABLE_ID = os.getenv('BQ_METADATA_TABLE_ID', 'filing_metadata')
+LOAD_BATCH_SIZE      = int(os.getenv('LOAD_BATCH_SIZE', '100'))
+LOAD_WAIT_ATTEMPTS   = int(os.getenv('LOAD_WAIT_ATTEMPTS', '3'))
 
 # --- Setup Logging ---
 logging.basicConfig(
@@ -130,10 +132,10 @@ def process_price_data(prices_df, ticker):
         return pd.DataFrame()
 
 # --- Incremental Update Function ---
-def update_prices_for_ticker(ticker: str, prices_table_id: str):
+def update_prices_for_ticker(ticker: str, prices_table_id: str) -> pd.DataFrame:
     """
     Fetches stock prices for a single ticker from the last recorded date in BigQuery
-    up to the current date and appends them.
+    up to the current date. Returns the processed rows to append (empty if none).
     """
     logging.info(f"--- Starting Price Update for {ticker} ---")
     max_date = None
@@ -163,7 +165,7 @@ def update_prices_for_ticker(ticker: str, prices_table_id: str):
         logging.warning(f"Table {prices_table_id} not found or no data for {ticker}.")
     except Exception as e:
         logging.error(f"Error fetching max date for {ticker}: {e}", exc_info=True)
-        return
+        return pd.DataFrame()
 
     # 2) Build date window
     if max_date:
@@ -174,7 +176,7 @@ def update_prices_for_ticker(ticker: str, prices_table_id: str):
 
     if start_date >= end_date:
         logging.info(f"{ticker} is already up to date ({max_date}). Skipping.")
-        return
+        return pd.DataFrame()
 
     start_str = start_date.strftime('%Y-%m-%d')
     end_str   = end_date.strftime('%Y-%m-%d')
@@ -187,51 +189,69 @@ def update_prices_for_ticker(ticker: str, prices_table_id: str):
 
         if prices.empty:
             logging.info(f"No new data for {ticker} in {start_str}–{end_str}.")
-            return
+            return pd.DataFrame()
 
         logging.info(f"Fetched {len(prices)} rows for {ticker}.")
         new_df = process_price_data(prices, ticker)
 
     except Exception as e:
         logging.error(f"Error fetching yfinance data for {ticker}: {e}", exc_info=True)
-        return
-
-    # 4) Load into BigQuery with detailed error logging
-    if not new_df.empty:
-        table_ref = bigquery.Table(prices_table_id)
-        schema = [
-            bigquery.SchemaField('ticker', 'STRING', mode='NULLABLE'),
-            bigquery.SchemaField('date',   'TIMESTAMP', mode='NULLABLE'),
-            bigquery.SchemaField('open',   'FLOAT',     mode='NULLABLE'),
-            bigquery.SchemaField('high',   'FLOAT',     mode='NULLABLE'),
-            bigquery.SchemaField('low',    'FLOAT',     mode='NULLABLE'),
-            bigquery.SchemaField('adj_close', 'FLOAT',  mode='NULLABLE'),
-            bigquery.SchemaField('volume', 'INTEGER',   mode='NULLABLE'),
-        ]
-        final_schema = [f for f in schema if f.name in new_df.columns]
-
-        job_config = bigquery.LoadJobConfig(
-            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
-            schema=final_schema
-        )
-
-        logging.info(f"Appending {len(new_df)} rows for {ticker}…")
-        try:
-            load_job = bq_client.load_table_from_dataframe(
-                new_df, table_ref, job_config=job_config
-            )
-            load_job.result(timeout=300)  # allow up to 5 minutes
-            logging.info(f"Appended {load_job.output_rows} rows for {ticker}.")
-        except Exception as e:
-            logging.error(f"BigQuery load_job.result() failed for {ticker}: {e}", exc_info=True)
-            if hasattr(load_job, "errors") and load_job.errors:
-                logging.error(f"Load job errors payload for {ticker}: {load_job.errors}")
-            raise
+        return pd.DataFrame()
 
-    else:
+    if new_df.empty:
         logging.info(f"No processed data for {ticker}, nothing to load.")
 
     logging.info(f"--- Finished Price Update for {ticker} ---")
+    return new_df
+
+# --- Batched Load ---
+def load_prices_to_bigquery(prices_df: pd.DataFrame, prices_table_id: str, tickers: list):
+    """
+    Appends the accumulated price rows for a batch of tickers in a single load job.
+    Returns True once the job succeeds and False if it finished with an error, in
+    which case nothing was written and the rows can be loaded again. Raises if the
+    job's outcome is unknown (submission or polling kept failing), since its rows
+    may still be written server-side.
+    """
+    table_ref = bigquery.Table(prices_table_id)
+    schema = [
+        bigquery.SchemaField('ticker', 'STRING', mode='NULLABLE'),
+        bigquery.SchemaField('date',   'TIMESTAMP', mode='NULLABLE'),
+        bigquery.SchemaField('open',   'FLOAT',     mode='NULLABLE'),
+        bigquery.SchemaField('high',   'FLOAT',     mode='NULLABLE'),
+        bigquery.SchemaField('low',    'FLOAT',     mode='NULLABLE'),
+        bigquery.SchemaField('adj_close', 'FLOAT',  mode='NULLABLE'),
+        bigquery.SchemaField('volume', 'INTEGER',   mode='NULLABLE'),
+    ]
+    final_schema = [f for f in schema if f.name in prices_df.columns]
+
+    job_config = bigquery.LoadJobConfig(
+        write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+        schema=final_schema
+    )
+
+    logging.info(f"Appending {len(prices_df)} rows for {len(tickers)} tickers…")
+    load_job = bq_client.load_table_from_dataframe(
+        prices_df, table_ref, job_config=job_config
+    )
+    for attempt in range(1, LOAD_WAIT_ATTEMPTS + 1):
+        try:
+            load_job.result(timeout=300)  # allow up to 5 minutes
+            logging.info(f"Appended {load_job.output_rows} rows for {len(tickers)} tickers.")
+            return True
+        except Exception as e:
+            try:
+                finished = load_job.done()
+            except Exception:
+                finished = False
+            if finished and load_job.error_result:
+                logging.error(f"Load job {load_job.job_id} failed for tickers {tickers}: {load_job.error_result}")
+                if load_job.errors:
+                    logging.error(f"Load job errors payload for tickers {tickers}: {load_job.errors}")
+                return False
+            # A timeout or polling error says nothing about the job itself; keep waiting on it.
+            logging.warning(f"Load job {load_job.job_id} not confirmed (attempt {attempt}/{LOAD_WAIT_ATTEMPTS}): {e}")
+    raise RuntimeError(f"Load job {load_job.job_id} for tickers {tickers} did not report a final state.")
 
 # --- Main Execution Block ---
 if __name__ == "__main__":
@@ -245,18 +265,49 @@ if __name__ == "__main__":
     logging.info(f"Updating prices for {len(tickers)} tickers…")
     processed = 0
     total     = len(tickers)
+    pending_frames  = []
+    pending_tickers = []
+
+    def flush_pending():
+        global processed
+        if not pending_frames:
+            return
+        try:
+            if load_prices_to_bigquery(pd.concat(pending_frames, ignore_index=True), PRICES_TABLE_FULL_ID, pending_tickers):
+                processed += len(pending_tickers)
+            else:
+                logging.warning(f"Batch load of {len(pending_tickers)} tickers failed; retrying each ticker separately.")
+                for frame, ticker in zip(pending_frames, pending_tickers):
+                    try:
+                        if load_prices_to_bigquery(frame, PRICES_TABLE_FULL_ID, [ticker]):
+                            processed += 1
+                    except Exception:
+                        logging.error(f"Unhandled error for {ticker}, continuing.", exc_info=True)
+        except Exception:
+            # Outcome unknown: the job may still append these rows, so re-loading them could duplicate them.
+            logging.error(f"Load outcome unknown for {len(pending_tickers)} tickers; not re-appending them.", exc_info=True)
+        pending_frames.clear()
+        pending_tickers.clear()
 
     for i, ticker in enumerate(tickers, start=1):
         try:
-            update_prices_for_ticker(ticker, PRICES_TABLE_FULL_ID)
-            processed += 1
+            new_df = update_prices_for_ticker(ticker, PRICES_TABLE_FULL_ID)
+            if new_df.empty:
+                processed += 1
+            else:
+                pending_frames.append(new_df)
+                pending_tickers.append(ticker)
         except Exception:
             logging.error(f"Unhandled error for {ticker}, continuing.", exc_info=True)
 
+        if len(pending_tickers) >= LOAD_BATCH_SIZE:
+            flush_pending()
+
         # simple rate‑limit
         time.sleep(0.75)
 
-        if i % 50 == 0 or i == total:
+        if i % 50 == 0:
             logging.info(f"Progress: {processed}/{total} tickers processed.")
 
-    logging.info(f"--- Completed Update Job: {processed}/{total} tickers processed. ---")
\ No newline at end of file
+    flush_pending()
+    logging.info(f"--- Completed Update Job: {processed}/{total} tickers processed. ---")
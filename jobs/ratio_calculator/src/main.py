@@ -8,6 +8,7 @@ import re
 import threading
 import time
 import concurrent.futures
+import functools
 from datetime import datetime, timedelta, date
 from decimal import Decimal
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
@@ -113,11 +114,13 @@ def initialize_clients():
     GENAI_CLIENT = genai.Client(api_key=api_key)
     return True
     
+@functools.lru_cache(maxsize=4096)
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=5), reraise=True)
 def get_price_on_or_before(ticker: str, target_date: date) -> float | None:
     """
     Returns the adjusted close for `ticker` on or before `target_date`,
-    looking back up to 7 calendar days.
+    looking back up to 7 calendar days. Results are memoized for the run,
+    since a filing's report date is looked up again as the next filing's prior period.
     """
     if not BQ_CLIENT:
         raise RuntimeError("BQ Client not initialized.")